@@ -0,0 +1,67 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+FIGURE_CACHE_BYTES = int(float(os.environ.get('AUTO_MPG_FIGURE_CACHE_MB', 256)) * 1024 * 1024)
+
+
+def dataset_version(data):
+    # Content hash of the loaded rows, so cached figures are invalidated whenever the data changes. The row hashes
+    # are hashed in order: the same rows in another order are another dataset for anything positional.
+    hashes = pd.util.hash_pandas_object(data, index=False).to_numpy()
+    return hashlib.blake2b(hashes.tobytes(), digest_size=8).hexdigest()
+
+
+class FigureCache:
+    # Built figures keyed on (dataset version, chart, filters, parameters), evicted least recently used first.
+    # Entries are budgeted by their serialized JSON size, which is what st.plotly_chart sends to the browser.
+    def __init__(self, max_bytes=FIGURE_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key][0]
+            self.misses += 1
+
+        figure = build()
+        size = len(figure.to_json())
+        with self._lock:
+            if key in self._entries:
+                self.bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (figure, size)
+            self.bytes += size
+            # The newest entry is kept even when it alone exceeds the budget
+            while self.bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+                self.evictions += 1
+        return figure
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {'entries': len(self._entries), 'bytes': self.bytes, 'max_bytes': self.max_bytes,
+                'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0}
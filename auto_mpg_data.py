@@ -0,0 +1,145 @@
+import argparse
+import copy
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+URL = "http://archive.ics.uci.edu/ml/machine-learning-databases/auto-mpg/auto-mpg.data"
+COLUMNS = ['MPG', 'Cylinders', 'Displacement', 'Horsepower', 'Weight', 'Acceleration', 'Model Year', 'Origin', 'Car Name']
+ORIGINS = ['USA', 'Europe', 'Japan']
+DTYPES = {'MPG': 'float64', 'Cylinders': 'int64', 'Displacement': 'float64', 'Horsepower': 'float64',
+          'Weight': 'float64', 'Acceleration': 'float64', 'Model Year': 'int64', 'Origin': 'int64',
+          'Car Name': 'category'}
+
+# Locations can be overridden per deployment, e.g. a snapshot baked into the image
+SNAPSHOT_PATH = os.environ.get(
+    'AUTO_MPG_SNAPSHOT', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'auto_mpg.arrow'))
+SOURCE = os.environ.get('AUTO_MPG_SOURCE', URL)
+
+
+def parse_raw(source=SOURCE):
+    # '?' marks the missing horsepower values in the raw file
+    data = pd.read_csv(source, sep=r'\s+', names=COLUMNS, na_values={'Horsepower': ['?']}, dtype=DTYPES)
+    data['Origin'] = pd.Categorical.from_codes(data['Origin'].to_numpy() - 1, categories=ORIGINS)
+    data['Manufacturer'] = manufacturers_from_names(data['Car Name'])
+    return data
+
+
+def manufacturers_from_names(car_names):
+    # Split only the distinct car names, then broadcast back through the category codes
+    names = car_names.cat.categories
+    manufacturer_codes, manufacturers = pd.factorize(names.str.split(n=1).str[0], sort=True)
+    return pd.Categorical.from_codes(manufacturer_codes[car_names.cat.codes.to_numpy()], categories=manufacturers)
+
+
+def write_snapshot(data, path=SNAPSHOT_PATH):
+    # Uncompressed Arrow IPC so the file can be memory-mapped without decoding
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    tmp_path = path + '.tmp'
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(tmp_path, path)
+    return path
+
+
+def read_snapshot(path=SNAPSHOT_PATH):
+    # Columns without nulls stay zero-copy views over the mapped file
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    return table.to_pandas(split_blocks=True)
+
+
+def load_auto_mpg(snapshot=SNAPSHOT_PATH, source=SOURCE):
+    if os.path.exists(snapshot):
+        return read_snapshot(snapshot)
+    return parse_raw(source)
+
+
+class FilterIndex:
+    # Sorted row positions per manufacturer and model year, built once per dataset
+    def __init__(self, data):
+        self.manufacturer_codes, self.manufacturers = self._positions(data['Manufacturer'])
+        self.year_codes, self.years = self._positions(data['Model Year'])
+
+    @staticmethod
+    def _positions(column):
+        codes, values = pd.factorize(column, sort=True)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+        return codes, {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(values)}
+
+    def extended(self, batch):
+        # Rows appended after the indexed ones sort after every existing position, so groups only grow at the end
+        offset = len(self.manufacturer_codes)
+        index = copy.copy(self)
+        index.manufacturer_codes, index.manufacturers = self._extend(
+            self.manufacturer_codes, self.manufacturers, batch['Manufacturer'], offset)
+        index.year_codes, index.years = self._extend(self.year_codes, self.years, batch['Model Year'], offset)
+        return index
+
+    @staticmethod
+    def _extend(codes, positions, column, offset):
+        # New values get the next free code, so existing codes keep their meaning
+        added_codes, added = FilterIndex._positions(column)
+        positions = dict(positions)
+        for value, rows in added.items():
+            rows = rows + offset
+            positions[value] = np.concatenate([positions[value], rows]) if value in positions else rows
+        remap = pd.Index(list(positions)).get_indexer(list(added))
+        return np.concatenate([codes, np.where(added_codes >= 0, remap[added_codes], -1)]), positions
+
+    def lookup(self, manufacturers=None, years=None):
+        # None leaves a key unfiltered; years is an inclusive (first, last) range. Returns None when every row is kept.
+        keys = []
+        if manufacturers is not None:
+            keys.append((self.manufacturers, self.manufacturer_codes,
+                         [value in manufacturers for value in self.manufacturers]))
+        if years is not None:
+            first, last = years
+            keys.append((self.years, self.year_codes, [first <= value <= last for value in self.years]))
+        # A key that keeps every value filters nothing
+        keys = [(groups, codes, np.asarray(keep, dtype=bool)) for groups, codes, keep in keys if not all(keep)]
+        if not keys:
+            return None
+
+        # One kept group is already a sorted run of positions; several are marked in one pass over the per-row
+        # codes instead of being merged and sorted. The other keys are then checked through their codes.
+        keys.sort(key=lambda key: sum(len(rows) for rows, kept in zip(key[0].values(), key[2]) if kept))
+        groups, codes, keep = keys[0]
+        if keep.sum() == 1:
+            positions = groups[next(value for value, kept in zip(groups, keep) if kept)]
+        else:
+            # Code -1 (a missing value) lands on the trailing False
+            positions = np.flatnonzero(np.append(keep, False)[codes])
+        for _, codes, keep in keys[1:]:
+            positions = positions[np.append(keep, False)[codes[positions]]]
+        return positions
+
+    def select(self, data, manufacturers=None, years=None):
+        positions = self.lookup(manufacturers, years)
+        if positions is None:
+            return data
+        # A contiguous run of rows is sliced as a view, anything else gathers only the selected rows
+        if len(positions) and positions[-1] - positions[0] + 1 == len(positions):
+            return data.iloc[positions[0]:positions[-1] + 1]
+        return data.take(positions)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse the raw Auto MPG file into a memory-mappable snapshot.")
+    parser.add_argument('source', nargs='?', default=SOURCE, help="URL or local path of auto-mpg.data")
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH, help="Where to write the Arrow IPC snapshot")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    data = parse_raw(args.source)
+    write_snapshot(data, args.snapshot)
+    print(f"Wrote {len(data)} rows to {args.snapshot} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+import argparse
+import hashlib
+import html
+import json
+import os
+import re
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from auto_mpg_cache import dataset_version
+from auto_mpg_data import SNAPSHOT_PATH, SOURCE, FilterIndex, load_auto_mpg, read_snapshot, write_snapshot
+from auto_mpg_report import SECTIONS
+from auto_mpg_stream import DataStore
+
+try:
+    import markdown
+except ImportError:
+    markdown = None
+
+# Everything a worker runs to render a slice: a change to any of these can change a rendered report, so their
+# source is part of every slice's input hash
+REPORT_MODULES = ['auto_mpg_export.py', 'auto_mpg_report.py', 'auto_mpg_figures.py', 'auto_mpg_stats.py',
+                  'auto_mpg_data.py', 'auto_mpg_stream.py', 'auto_mpg_cache.py']
+SLICE_KINDS = ['all', 'manufacturer', 'year']
+MANIFEST = 'manifest.json'
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+<style>body {{ font-family: sans-serif; max-width: 960px; margin: 2em auto; }}</style>
+</head>
+<body>
+{body}
+</body>
+</html>
+"""
+
+
+def markdown_to_html(text):
+    # The report text is indented to sit inside Python strings; Markdown would read that as code blocks
+    text = '\n'.join(line.strip() for line in text.splitlines())
+    if markdown is not None:
+        return markdown.markdown(text)
+    # Without the markdown package: headings, bullet and numbered lists, bold and paragraphs
+    lines = []
+    open_list = None
+    for line in text.splitlines():
+        line = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html.escape(line, quote=False))
+        item = re.match(r'(-|\d+\.) (.*)', line)
+        # A run of list lines becomes one <ul> or <ol>; anything else closes it
+        tag = None if item is None else 'ul' if item.group(1) == '-' else 'ol'
+        if open_list and tag != open_list:
+            lines.append(f"</{open_list}>")
+            open_list = None
+        if tag and not open_list:
+            lines.append(f"<{tag}>")
+            open_list = tag
+        heading = re.match(r'(#{1,6}) (.*)', line)
+        if item:
+            lines.append(f"<li>{item.group(2)}</li>")
+        elif heading:
+            level = len(heading.group(1))
+            lines.append(f"<h{level}>{heading.group(2)}</h{level}>")
+        elif line:
+            lines.append(f"<p>{line}</p>")
+    if open_list:
+        lines.append(f"</{open_list}>")
+    return '\n'.join(lines)
+
+
+def slice_name(kind, value):
+    return kind if kind == 'all' else f"{kind}-{re.sub(r'[^0-9A-Za-z]+', '_', str(value)).strip('_')}"
+
+
+def report_slices(data, kinds):
+    # (kind, value) pairs in a stable order; 'all' is the whole dataset
+    index = FilterIndex(data)
+    slices = []
+    for kind in kinds:
+        if kind == 'all':
+            slices.append(('all', None))
+        elif kind == 'manufacturer':
+            slices.extend(('manufacturer', value) for value in sorted(index.manufacturers))
+        elif kind == 'year':
+            slices.extend(('year', int(value)) for value in sorted(index.years))
+    return slices
+
+
+def code_version():
+    digest = hashlib.sha256()
+    for name in REPORT_MODULES:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), name), 'rb') as f:
+            digest.update(f.read())
+    # The narrative renders differently with and without the markdown package
+    digest.update(b'markdown' if markdown is not None else b'fallback')
+    return digest.hexdigest()[:16]
+
+
+_worker = {}
+
+
+def init_worker(snapshot, code):
+    # Each worker memory-maps the snapshot once; tasks then carry only a slice key, never rows
+    data = read_snapshot(snapshot)
+    _worker.update(data=data, index=FilterIndex(data), code=code)
+
+
+def render_slice(kind, value, output, formats, previous_hash):
+    # Returns the slice's input hash and whether it was rendered, or skipped as unchanged
+    start = time.perf_counter()
+    data, index = _worker['data'], _worker['index']
+    if kind == 'manufacturer':
+        data = index.select(data, [value], None)
+    elif kind == 'year':
+        data = index.select(data, None, (value, value))
+    data = data.reset_index(drop=True)
+    input_hash = f"{_worker['code']}-{dataset_version(data)}-{'+'.join(formats)}"
+    name = slice_name(kind, value)
+    if input_hash == previous_hash and all(os.path.exists(path) for path in output_paths(output, name, formats)):
+        return name, input_hash, False, time.perf_counter() - start
+
+    state = DataStore(data).state
+
+    title = "Automobile Data Analysis Report" + ("" if kind == 'all' else f" ({kind}: {value})")
+    body = []
+    figures = []
+    for section, content in SECTIONS:
+        if section == 'figure':
+            figure = content(state)
+            figures.append((content.__name__, figure))
+            # plotly.js is loaded once, by the first figure
+            body.append(figure.to_html(full_html=False, include_plotlyjs='cdn' if len(figures) == 1 else False))
+        elif section == 'markdown':
+            body.append(markdown_to_html(content))
+        else:
+            if section == 'header':
+                body.append(f"<h1>{html.escape(title)}</h1>\n<p>{len(data)} rows</p>")
+            else:
+                body.append(f"<h2>{html.escape(content)}</h2>")
+
+    paths = iter(output_paths(output, name, formats))
+    if 'html' in formats:
+        write_file(next(paths), PAGE.format(title=html.escape(title), body='\n'.join(body)))
+    if 'png' in formats:
+        for (_, figure), path in zip(figures, paths):
+            figure.write_image(path)
+    return name, input_hash, True, time.perf_counter() - start
+
+
+def output_paths(output, name, formats):
+    # One HTML page per slice, or one PNG per figure
+    paths = []
+    if 'html' in formats:
+        paths.append(os.path.join(output, f"{name}.html"))
+    if 'png' in formats:
+        paths.extend(os.path.join(output, f"{name}-{content.__name__}.png")
+                     for section, content in SECTIONS if section == 'figure')
+    return paths
+
+
+def write_file(path, text):
+    # Written beside the target and renamed, so an interrupted run never leaves a half-written report
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+def export_reports(snapshot, output, kinds=('manufacturer',), formats=('html',), workers=None, force=False):
+    os.makedirs(output, exist_ok=True)
+    manifest_path = os.path.join(output, MANIFEST)
+    manifest = {}
+    if os.path.exists(manifest_path) and not force:
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+
+    code = code_version()
+    slices = report_slices(read_snapshot(snapshot), kinds)
+    start = time.perf_counter()
+    rendered = skipped = 0
+    try:
+        with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(snapshot, code)) as pool:
+            futures = [pool.submit(render_slice, kind, value, output, list(formats),
+                                   manifest.get(slice_name(kind, value)))
+                       for kind, value in slices]
+            for future in as_completed(futures):
+                name, input_hash, was_rendered, _ = future.result()
+                manifest[name] = input_hash
+                rendered += was_rendered
+                skipped += not was_rendered
+    finally:
+        # Slices finished before a failure are not rendered again on the next run
+        write_file(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+    seconds = time.perf_counter() - start
+    return {'slices': len(slices), 'rendered': rendered, 'skipped': skipped, 'seconds': seconds,
+            'reports_per_minute': rendered / seconds * 60 if seconds else 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the Auto MPG report as static files, one per data slice.")
+    parser.add_argument('output', help="Directory for the reports and their manifest")
+    parser.add_argument('--by', nargs='+', choices=SLICE_KINDS, default=['manufacturer'],
+                        help="Slice the data by these columns; 'all' is one report of the whole dataset")
+    parser.add_argument('--format', nargs='+', choices=['html', 'png'], default=['html'], dest='formats',
+                        help="png writes one image per figure and needs the kaleido package")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument('--force', action='store_true', help="Render every slice, even when its inputs are unchanged")
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH, help="Arrow snapshot to read")
+    parser.add_argument('--source', default=SOURCE, help="Raw data to parse when the snapshot does not exist")
+    args = parser.parse_args()
+
+    if 'png' in args.formats:
+        try:
+            import kaleido  # noqa: F401
+        except ImportError:
+            parser.error("--format png needs the kaleido package (pip install kaleido)")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = args.snapshot
+        if not os.path.exists(snapshot):
+            # Workers need a file to memory-map
+            snapshot = write_snapshot(load_auto_mpg(snapshot, args.source), os.path.join(tmp, 'auto_mpg.arrow'))
+        result = export_reports(snapshot, args.output, args.by, args.formats, args.workers, args.force)
+    print(f"{result['rendered']} of {result['slices']} reports rendered, {result['skipped']} unchanged, "
+          f"in {result['seconds']:.1f}s ({result['reports_per_minute']:.0f} reports/min)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import copy
+import os
+
+import numpy as np
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+from auto_mpg_data import ORIGINS
+from auto_mpg_stats import ols_fits
+
+# Above this many rows the scatter plot switches to WebGL and server-side downsampling
+SCATTER_WEBGL_ROWS = int(os.environ.get('AUTO_MPG_WEBGL_ROWS', 20000))
+# Cells per axis kept by the downsampling grid, which bounds the points sent per color group
+SCATTER_GRID = int(os.environ.get('AUTO_MPG_SCATTER_GRID', 150))
+SCATTER_HOVER_COLUMNS = ['Car Name', 'Model Year']
+# Raw points drawn per violin before they are sampled
+VIOLIN_MAX_POINTS = int(os.environ.get('AUTO_MPG_VIOLIN_POINTS', 1000))
+VIOLIN_HOVER_COLUMNS = ['Manufacturer', 'Car Name', 'Model Year']
+# Resolution of the binned kernel density estimate behind each violin
+KDE_BINS = 100
+ORIGIN_COLORS = dict(zip(ORIGINS, qualitative.Plotly))
+
+
+def _grid_cells(values, grid):
+    low, high = np.nanmin(values), np.nanmax(values)
+    if high <= low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * grid).astype(np.int64), grid - 1)
+
+
+def downsample_scatter(data, x, y, color=None, grid=SCATTER_GRID):
+    # One row per occupied (color, x cell, y cell), so sparse regions and outliers always survive
+    xs = data[x].to_numpy(dtype=float)
+    ys = data[y].to_numpy(dtype=float)
+    positions = np.flatnonzero(~(np.isnan(xs) | np.isnan(ys)))
+    if len(positions) == 0:
+        return positions
+    cells = _grid_cells(xs[positions], grid) * grid + _grid_cells(ys[positions], grid)
+    n_cells = grid * grid
+    if color is not None:
+        codes = data[color].cat.codes.to_numpy()[positions].astype(np.int64)
+        cells += codes * n_cells
+        n_cells *= len(data[color].cat.categories)
+    # First row landing in each cell, without sorting the rows
+    first = np.full(n_cells, len(positions))
+    np.minimum.at(first, cells, np.arange(len(positions)))
+    return positions[np.sort(first[first < len(positions)])]
+
+
+def trendline_traces(fits, x, y, webgl=False):
+    # Straight OLS lines over each group's x range, drawn as plain traces
+    trace_type = go.Scattergl if webgl else go.Scatter
+    traces = []
+    for name, fit in fits.iterrows():
+        line_x = np.array([fit['x_min'], fit['x_max']])
+        traces.append(trace_type(
+            x=line_x, y=fit['slope'] * line_x + fit['intercept'], mode='lines', name=name, legendgroup=name,
+            showlegend=False, line_color=ORIGIN_COLORS.get(name, qualitative.Plotly[0]),
+            hovertemplate=f"<b>OLS trendline</b><br>{y} = {fit['slope']:.6g} * {x} + {fit['intercept']:.6g}<br>"
+                          f"R<sup>2</sup>={fit['rsquared']:.6f}<extra>{name}</extra>"))
+    return traces
+
+
+def scatter_figure(data, x, y, color=None, trendline=False, fits=None, webgl_rows=SCATTER_WEBGL_ROWS,
+                   grid=SCATTER_GRID):
+    # fits can come precomputed from TrendlineStats; otherwise they are fitted on every row of data
+    # plotly.express pulls in a lot at import time and is only needed here
+    import plotly.express as px
+
+    webgl = len(data) > webgl_rows
+    if not webgl:
+        fig = px.scatter(data, x=x, y=y, color=color, hover_data=data.columns, color_discrete_map=ORIGIN_COLORS)
+    else:
+        positions = downsample_scatter(data, x, y, color, grid)
+        sample = data.take(positions).assign(Row=positions)
+        fig = px.scatter(sample, x=x, y=y, color=color, hover_data=SCATTER_HOVER_COLUMNS, custom_data=['Row'],
+                         render_mode='webgl', color_discrete_map=ORIGIN_COLORS)
+        fig.update_layout(title=f"Showing {len(positions):,} of {len(data):,} points")
+    if trendline:
+        fig.add_traces(trendline_traces(fits if fits is not None else ols_fits(data, x, y, color), x, y, webgl))
+    return fig
+
+
+def selected_rows(data, event):
+    # Full rows for the points picked in a downsampled scatter plot
+    points = event.selection.points if event else []
+    positions = [point['customdata'][0] for point in points if point.get('customdata')]
+    return data.take(positions)
+
+
+class ColumnGroups:
+    # One column's non-missing values sorted within each color group, with their row positions
+    def __init__(self, data, column, color=None):
+        values = data[column].to_numpy(dtype=float)
+        positions = np.flatnonzero(~np.isnan(values))
+        positions = positions[np.argsort(values[positions], kind='stable')]
+        if color is None:
+            self.names = ['']
+            bounds = [0, len(positions)]
+        else:
+            codes = data[color].cat.codes.to_numpy()[positions]
+            order = np.argsort(codes, kind='stable')
+            positions = positions[order]
+            self.names = list(data[color].cat.categories)
+            bounds = np.searchsorted(codes[order], np.arange(len(self.names) + 1))
+        self.column = column
+        self.color = color
+        self.values = values[positions]
+        self.positions = positions
+        self.bounds = bounds
+
+    def __iter__(self):
+        for i, name in enumerate(self.names):
+            start, stop = self.bounds[i], self.bounds[i + 1]
+            if stop > start:
+                yield name, self.values[start:stop], self.positions[start:stop]
+
+    def extended(self, batch, offset):
+        # Merges rows appended at position offset into each sorted group in linear time, without re-sorting
+        added = ColumnGroups(batch, self.column, self.color)
+        values, positions, sizes = [], [], []
+        for i in range(len(self.names)):
+            old_values = self.values[self.bounds[i]:self.bounds[i + 1]]
+            new_values = added.values[added.bounds[i]:added.bounds[i + 1]]
+            at = np.searchsorted(old_values, new_values, side='right') + np.arange(len(new_values))
+            kept = np.ones(len(old_values) + len(new_values), dtype=bool)
+            kept[at] = False
+            merged_values = np.empty(len(kept))
+            merged_values[at] = new_values
+            merged_values[kept] = old_values
+            merged_positions = np.empty(len(kept), dtype=self.positions.dtype)
+            merged_positions[at] = added.positions[added.bounds[i]:added.bounds[i + 1]] + offset
+            merged_positions[kept] = self.positions[self.bounds[i]:self.bounds[i + 1]]
+            values.append(merged_values)
+            positions.append(merged_positions)
+            sizes.append(len(kept))
+        merged = copy.copy(self)
+        merged.values = np.concatenate(values)
+        merged.positions = np.concatenate(positions)
+        merged.bounds = np.concatenate([[0], np.cumsum(sizes)])
+        return merged
+
+    def range(self):
+        groups = [values for _, values, _ in self]
+        if not groups:
+            return 0.0, 1.0
+        return min(values[0] for values in groups), max(values[-1] for values in groups)
+
+
+def bin_counts(sorted_values, edges):
+    # Counts per bin from a sorted column, the last bin closed on the right like np.histogram
+    cuts = np.searchsorted(sorted_values, edges, side='left')
+    cuts[-1] = np.searchsorted(sorted_values, edges[-1], side='right')
+    return np.diff(cuts)
+
+
+def quantiles(sorted_values, qs):
+    # Linear interpolation on an already sorted column, as np.quantile would do
+    index = np.asarray(qs) * (len(sorted_values) - 1)
+    low = np.floor(index).astype(int)
+    high = np.minimum(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (index - low)
+
+
+def box_stats(sorted_values):
+    q1, median, q3 = quantiles(sorted_values, [0.25, 0.5, 0.75])
+    iqr = q3 - q1
+    lower = sorted_values[np.searchsorted(sorted_values, q1 - 1.5 * iqr, side='left')]
+    upper = sorted_values[np.searchsorted(sorted_values, q3 + 1.5 * iqr, side='right') - 1]
+    return {'q1': q1, 'median': median, 'q3': q3, 'lowerfence': lower, 'upperfence': upper}
+
+
+def kde(sorted_values, bins=KDE_BINS):
+    # Gaussian KDE evaluated on a binned grid, with plotly's default bandwidth rule
+    n = len(sorted_values)
+    q1, q3 = quantiles(sorted_values, [0.25, 0.75])
+    spread = min(np.std(sorted_values), (q3 - q1) / 1.349) or np.std(sorted_values) or 1.0
+    bandwidth = 1.059 * spread * n ** -0.2
+    edges = np.linspace(sorted_values[0] - 2 * bandwidth, sorted_values[-1] + 2 * bandwidth, bins + 1)
+    centers = (edges[:-1] + edges[1:]) / 2
+    counts = bin_counts(sorted_values, edges)
+    offsets = (centers[:, None] - centers[None, :]) / bandwidth
+    density = np.exp(-0.5 * offsets ** 2) @ counts / (n * bandwidth * np.sqrt(2 * np.pi))
+    return centers, density
+
+
+def box_figure(groups, **layout):
+    # Boxes from precomputed quartiles and fences, with only the points beyond the fences sent as outliers
+    fig = go.Figure()
+    for name, values, _ in groups:
+        stats = box_stats(values)
+        outliers = np.concatenate([values[values < stats['lowerfence']], values[values > stats['upperfence']]])
+        color = ORIGIN_COLORS.get(name, qualitative.Plotly[0])
+        fig.add_trace(go.Box(x=[name], name=name, marker_color=color, showlegend=bool(name),
+                             **{key: [value] for key, value in stats.items()}))
+        if len(outliers):
+            fig.add_trace(go.Scatter(x=[name] * len(outliers), y=outliers, mode='markers', name=name,
+                                     legendgroup=name, showlegend=False, marker_color=color))
+    fig.update_layout(xaxis_title=groups.color, yaxis_title=groups.column, legend_title_text=groups.color)
+    fig.update_layout(**layout)
+    return fig
+
+
+def histogram_figure(groups, nbins, histnorm='percent', opacity=0.75, colors=None, **layout):
+    # Bars from precomputed bin counts, sharing one set of edges across the color groups
+    low, high = groups.range()
+    edges = np.linspace(low, high if high > low else low + 1, nbins + 1)
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure()
+    for i, (name, values, _) in enumerate(groups):
+        counts = bin_counts(values, edges)
+        y = counts / len(values) * 100 if histnorm == 'percent' else counts
+        color = colors[i % len(colors)] if colors else ORIGIN_COLORS.get(name)
+        fig.add_trace(go.Bar(x=centers, y=y, width=edges[1] - edges[0], name=name, showlegend=bool(name),
+                             marker_color=color, opacity=opacity, marker_line_color='black', marker_line_width=1,
+                             customdata=np.column_stack([edges[:-1], edges[1:]]),
+                             hovertemplate="%{customdata[0]:.4g} - %{customdata[1]:.4g}<br>%{y:.4g}<extra>%{fullData.name}</extra>"))
+    fig.update_layout(barmode='overlay', bargap=0, xaxis_title=groups.column,
+                      yaxis_title=histnorm or 'count', legend_title_text=groups.color)
+    fig.update_layout(**layout)
+    return fig
+
+
+def violin_figure(groups, data, max_points=VIOLIN_MAX_POINTS, hover_columns=VIOLIN_HOVER_COLUMNS, seed=0):
+    # Violin outlines, box statistics and a capped sample of raw points, all computed on the server
+    rng = np.random.default_rng(seed)
+    fig = go.Figure()
+    names = []
+    for x, (name, values, positions) in enumerate(groups):
+        names.append(name)
+        color = ORIGIN_COLORS.get(name, qualitative.Plotly[0])
+        centers, density = kde(values)
+        half_width = density / density.max() * 0.4
+        fig.add_trace(go.Scatter(x=np.concatenate([x - half_width, (x + half_width)[::-1]]),
+                                 y=np.concatenate([centers, centers[::-1]]), fill='toself', mode='lines',
+                                 line_color=color, name=name, legendgroup=name, showlegend=bool(name),
+                                 hoverinfo='skip'))
+        fig.add_trace(go.Box(x=[x], width=0.08, fillcolor='white', line_color=color, name=name, legendgroup=name,
+                             showlegend=False, **{key: [value] for key, value in box_stats(values).items()}))
+
+        if len(positions) > max_points:
+            positions = np.sort(rng.choice(positions, max_points, replace=False))
+        sample = data.take(positions)
+        hover = sample[hover_columns].astype(str).to_numpy()
+        fig.add_trace(go.Scatter(
+            x=x + rng.uniform(-0.3, 0.3, len(sample)), y=sample[groups.column], mode='markers', name=name,
+            legendgroup=name, showlegend=False, customdata=hover,
+            marker=dict(color=color, size=5, line=dict(color='black', width=1)),
+            hovertemplate="<br>".join([f"{groups.column}=%{{y}}"] + [
+                f"{column}=%{{customdata[{i}]}}" for i, column in enumerate(hover_columns)]) + "<extra></extra>"))
+    fig.update_layout(xaxis=dict(tickvals=list(range(len(names))), ticktext=names, title=groups.color),
+                      yaxis_title=groups.column, legend_title_text=groups.color)
+    return fig
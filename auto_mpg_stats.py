@@ -0,0 +1,124 @@
+import copy
+
+import numpy as np
+import pandas as pd
+
+# Sufficient statistics of a simple regression, accumulated about a fixed shift to limit cancellation
+MOMENTS = ['n', 'x', 'y', 'xx', 'xy', 'yy', 'x_min', 'x_max']
+
+
+def grouped_moments(x, y, groups, n_groups, shift=(0.0, 0.0)):
+    # One pass of bincounts over every group at once; rows with a missing x or y are skipped
+    valid = ~(np.isnan(x) | np.isnan(y)) & (groups >= 0)
+    x, y, groups = x[valid], y[valid], groups[valid]
+    dx, dy = x - shift[0], y - shift[1]
+    moments = np.empty((len(MOMENTS), n_groups))
+    moments[0] = np.bincount(groups, minlength=n_groups)
+    for i, weights in enumerate([dx, dy, dx * dx, dx * dy, dy * dy], start=1):
+        moments[i] = np.bincount(groups, weights=weights, minlength=n_groups)
+    moments[6] = np.inf
+    moments[7] = -np.inf
+    np.minimum.at(moments[6], groups, x)
+    np.maximum.at(moments[7], groups, x)
+    return moments
+
+
+def combine_moments(moments, axis):
+    # Pooled statistics of several groups are plain sums, apart from the x range
+    return np.concatenate([moments[:6].sum(axis=axis), moments[6:7].min(axis=axis, initial=np.inf),
+                           moments[7:8].max(axis=axis, initial=-np.inf)])
+
+
+def ols_from_moments(moments, names, shift=(0.0, 0.0)):
+    # Slope, intercept and R² of y ~ 1 + x for each group, matching statsmodels OLS
+    n, sx, sy, sxx, sxy, syy, x_min, x_max = moments
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x, mean_y = sx / n, sy / n
+        cxx = sxx - sx * mean_x
+        cxy = sxy - sx * mean_y
+        cyy = syy - sy * mean_y
+        slope = cxy / cxx
+        intercept = mean_y + shift[1] - slope * (mean_x + shift[0])
+        rsquared = cxy * cxy / (cxx * cyy)
+    fits = pd.DataFrame({'slope': slope, 'intercept': intercept, 'rsquared': rsquared, 'nobs': n.astype(int),
+                         'x_min': x_min, 'x_max': x_max}, index=pd.Index(names, name='group'))
+    return fits[(fits['nobs'] >= 2) & np.isfinite(fits['slope'])]
+
+
+def ols_fits(data, x, y, color=None):
+    # Per-group fits straight from the rows, for callers without a precomputed TrendlineStats
+    xs = data[x].to_numpy(dtype=float)
+    ys = data[y].to_numpy(dtype=float)
+    shift = (np.nanmean(xs) if len(xs) else 0.0, np.nanmean(ys) if len(ys) else 0.0)
+    if color is None:
+        names = ['']
+        groups = np.zeros(len(data), dtype=np.intp)
+    else:
+        names = list(data[color].cat.categories)
+        groups = data[color].cat.codes.to_numpy().astype(np.intp)
+    return ols_from_moments(grouped_moments(xs, ys, groups, len(names), shift), names, shift)
+
+
+class TrendlineStats:
+    # Regression moments of y on x per (Origin, Manufacturer, Model Year) cell. Any filter on manufacturers
+    # and model years, with or without the Origin split, is then a sum over cells instead of a pass over rows.
+    def __init__(self, data, x, y, index):
+        xs = data[x].to_numpy(dtype=float)
+        ys = data[y].to_numpy(dtype=float)
+        self.shift = (np.nanmean(xs), np.nanmean(ys))
+        self.origins = list(data['Origin'].cat.categories)
+        self.manufacturers = list(index.manufacturers)
+        self.years = list(index.years)
+        shape = (len(self.origins), len(self.manufacturers), len(self.years))
+        origin_codes = data['Origin'].cat.codes.to_numpy().astype(np.intp)
+        codes = (origin_codes, index.manufacturer_codes, index.year_codes)
+        cells = np.ravel_multi_index(tuple(np.maximum(c, 0) for c in codes), shape)
+        cells[(codes[0] < 0) | (codes[1] < 0) | (codes[2] < 0)] = -1
+        self.moments = grouped_moments(xs, ys, cells, int(np.prod(shape)), self.shift).reshape((len(MOMENTS),) + shape)
+
+    def fits(self, by_origin=True, manufacturers=None, years=None):
+        moments = self.moments
+        if manufacturers is not None:
+            moments = moments[:, :, [value in manufacturers for value in self.manufacturers]]
+        if years is not None:
+            first, last = years
+            moments = moments[:, :, :, [first <= value <= last for value in self.years]]
+        moments = combine_moments(moments, axis=(2, 3))
+        if by_origin:
+            return ols_from_moments(moments, self.origins, self.shift)
+        return ols_from_moments(combine_moments(moments, axis=1)[:, None], [''], self.shift)
+
+
+class CorrelationMoments:
+    # Pairwise-complete co-moment sums behind DataFrame.corr(). They are additive, so appended rows only
+    # need their own sums before the Pearson matrix is recombined.
+    def __init__(self, data, columns, shift=None):
+        self.columns = list(columns)
+        values = data[self.columns].to_numpy(dtype=float)
+        self.shift = np.nanmean(values, axis=0) if shift is None else shift
+        values = values - self.shift
+        valid = (~np.isnan(values)).astype(float)
+        values = np.nan_to_num(values)
+        # Entry [i, j] sums over the rows where both column i and column j are present
+        self.n = valid.T @ valid
+        self.sx = values.T @ valid
+        self.sxx = (values * values).T @ valid
+        self.sxy = values.T @ values
+
+    def extended(self, batch):
+        added = CorrelationMoments(batch, self.columns, self.shift)
+        merged = copy.copy(self)
+        for name in ['n', 'sx', 'sxx', 'sxy']:
+            setattr(merged, name, getattr(self, name) + getattr(added, name))
+        return merged
+
+    def corr(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x = self.sx / self.n
+            mean_y = self.sx.T / self.n
+            cov = self.sxy - self.n * mean_x * mean_y
+            var_x = self.sxx - self.n * mean_x * mean_x
+            var_y = self.sxx.T - self.n * mean_y * mean_y
+            corr = cov / np.sqrt(var_x * var_y)
+        corr[self.n < 2] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
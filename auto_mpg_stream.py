@@ -0,0 +1,217 @@
+import bisect
+import io
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from auto_mpg_cache import dataset_version
+from auto_mpg_data import FilterIndex, parse_raw
+from auto_mpg_figures import ColumnGroups
+from auto_mpg_stats import CorrelationMoments
+
+# A raw-format file that is appended to, or a directory that receives raw-format batch files
+STREAM_PATH = os.environ.get('AUTO_MPG_STREAM')
+STREAM_POLL_SECONDS = float(os.environ.get('AUTO_MPG_STREAM_POLL', 1))
+STREAM_REFRESH_SECONDS = float(os.environ.get('AUTO_MPG_STREAM_REFRESH', 5))
+
+
+def append_rows(data, *batches):
+    # Concatenates column by column, merging the category lists instead of falling back to object dtype
+    frames = [data, *batches]
+    columns = {}
+    for column in data.columns:
+        if isinstance(data[column].dtype, pd.CategoricalDtype):
+            columns[column] = union_categoricals([frame[column] for frame in frames])
+        else:
+            columns[column] = np.concatenate([frame[column].to_numpy() for frame in frames])
+    return pd.DataFrame(columns)
+
+
+class StreamTail:
+    # Reads the complete lines added to a file since the last call, or the batch files not seen yet in a directory
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.seen = set()
+        # Directory batch files that failed to parse, with their error; they are retried on every read
+        self.errors = {}
+
+    def read(self):
+        if os.path.isdir(self.path):
+            return self._read_directory()
+        return self._read_file()
+
+    def _read_file(self):
+        if not os.path.exists(self.path):
+            return None
+        if os.path.getsize(self.path) < self.offset:
+            # Truncated or replaced: start over from the top
+            self.offset = 0
+        with open(self.path, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1
+        if end == 0:
+            return None
+        self.offset += end
+        return parse_raw(io.BytesIO(chunk[:end]))
+
+    def _read_directory(self):
+        # Hidden and partially written files are skipped until they are renamed into place
+        names = sorted(name for name in os.listdir(self.path)
+                       if name not in self.seen and not name.startswith('.') and not name.endswith('.tmp'))
+        batches = []
+        for name in names:
+            path = os.path.join(self.path, name)
+            if not os.path.isfile(path):
+                self.seen.add(name)
+                continue
+            # One malformed file must not cost the batches read alongside it
+            try:
+                batches.append(parse_raw(path))
+            except Exception as error:
+                self.errors[name] = f"{type(error).__name__}: {error}"
+                continue
+            self.seen.add(name)
+            self.errors.pop(name, None)
+        if not batches:
+            return None
+        return append_rows(*batches)
+
+
+class StoreState:
+    # One consistent version of the rows and everything derived from them; replaced, never mutated, on append.
+    # A state made by an append holds the last joined state plus the batches since, so appending costs time in
+    # proportion to the batch. The rows, filter index and column groups are joined once, when first read.
+    def __init__(self, version, data, index, correlation, groups, base=None, batches=()):
+        self.version = version
+        self.correlation = correlation
+        self.base = base
+        self.batches = batches
+        self.rows = len(data) if base is None else base.rows + sum(len(batch) for batch in batches)
+        self.updated_at = time.time()
+        self._data = data
+        self._index = index
+        self._groups = groups
+        self._lock = threading.Lock()
+
+    def _join(self):
+        with self._lock:
+            if self.base is None:
+                return
+            base, batch = self.base, append_rows(*self.batches)
+            self._data = append_rows(base.data, batch)
+            self._index = base.index.extended(batch)
+            self._groups = {key: groups.extended(batch, base.rows) for key, groups in list(base._groups.items())}
+            # Dropping the base lets the previous joined rows be freed
+            self.base, self.batches = None, ()
+
+    def tail(self):
+        # The joined state and the batches after it, for the next append to build on
+        with self._lock:
+            if self.base is None:
+                return self, ()
+            return self.base, self.batches
+
+    @property
+    def data(self):
+        self._join()
+        return self._data
+
+    @property
+    def index(self):
+        self._join()
+        if self._index is None:
+            self._index = FilterIndex(self._data)
+        return self._index
+
+    def column_groups(self, column, color=None):
+        # Built on first use, then merged forward when later versions are joined
+        self._join()
+        key = (column, color)
+        if key not in self._groups:
+            self._groups[key] = ColumnGroups(self._data, column, color)
+        return self._groups[key]
+
+
+class DataStore:
+    # Append-only in-memory store. An append only extends the heatmap's co-moment sums and queues the batch;
+    # the filter index and the sorted column groups behind the histograms, box plots and violins are extended
+    # with every queued batch at once when a session first reads the new version.
+    def __init__(self, data):
+        self.base_version = dataset_version(data)
+        self.heatmap_columns = data.select_dtypes(include=['float64', 'int32']).columns
+        self.state = StoreState(self.base_version, data, FilterIndex(data),
+                                CorrelationMoments(data, self.heatmap_columns), {})
+        self.rows_appended = 0
+        self.batches = 0
+        self.ingest_seconds = 0.0
+        self.last_poll = None
+        self.last_error = None
+        self.update_times = []
+        self.streaming = False
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def append(self, batch, parse_seconds=0.0):
+        with self._lock:
+            start = time.perf_counter() - parse_seconds
+            state = self.state
+            base, batches = state.tail()
+            rows_appended = self.rows_appended + len(batch)
+            # Append-only, so the base content plus the row count identifies a version
+            self.state = StoreState(f"{self.base_version}+{rows_appended}", None, None,
+                                    state.correlation.extended(batch), None, base, batches + (batch,))
+            self.rows_appended = rows_appended
+            self.batches += 1
+            self.update_times.append(self.state.updated_at)
+            self.ingest_seconds += time.perf_counter() - start
+
+    def start(self, path, poll_seconds=STREAM_POLL_SECONDS):
+        tail = StreamTail(path)
+        self.streaming = True
+
+        def run():
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                try:
+                    batch = tail.read()
+                    if batch is not None and len(batch):
+                        self.append(batch, time.perf_counter() - start)
+                    if tail.errors:
+                        self.last_error = '; '.join(f"{name}: {error}" for name, error in sorted(tail.errors.items()))
+                except Exception as error:
+                    # A malformed batch is reported and skipped; the stream keeps going
+                    self.last_error = f"{type(error).__name__}: {error}"
+                self.last_poll = time.time()
+                self._stop.wait(poll_seconds)
+
+        threading.Thread(target=run, name='auto-mpg-ingest', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    def metrics(self, rendered_at=None):
+        # Staleness is how long the oldest undrawn rows have waited for a session that last rendered at rendered_at
+        state = self.state
+        staleness = 0.0
+        if rendered_at is not None:
+            pending = bisect.bisect_right(self.update_times, rendered_at)
+            if pending < len(self.update_times):
+                staleness = time.time() - self.update_times[pending]
+        return {'rows': state.rows, 'rows_appended': self.rows_appended, 'batches': self.batches,
+                'rows_per_second': self.rows_appended / self.ingest_seconds if self.ingest_seconds else 0.0,
+                'staleness_seconds': staleness,
+                'seconds_since_poll': time.time() - self.last_poll if self.last_poll else None,
+                'last_error': self.last_error}
+
+
+def open_store(data, path=STREAM_PATH):
+    store = DataStore(data)
+    if path:
+        store.start(path)
+    return store
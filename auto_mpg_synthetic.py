@@ -0,0 +1,134 @@
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from auto_mpg_data import COLUMNS, ORIGINS, SNAPSHOT_PATH, SOURCE, load_auto_mpg, manufacturers_from_names
+
+NUMERIC_COLUMNS = ['MPG', 'Cylinders', 'Displacement', 'Horsepower', 'Weight', 'Acceleration', 'Model Year']
+# Columns that only take the values seen in the source data
+DISCRETE_COLUMNS = ['Cylinders', 'Model Year']
+CHUNK_ROWS = 1000000
+
+# Standard normal CDF tabulated once; np.interp over it stands in for scipy.stats.norm in both directions
+_NORMAL_Z = np.linspace(-8.5, 8.5, 8193)
+_NORMAL_CDF = np.array([0.5 * math.erfc(-z / math.sqrt(2)) for z in _NORMAL_Z])
+
+
+class AutoMpgModel:
+    # Gaussian copula per Origin: each Origin keeps its own marginals, rank correlations, share of rows,
+    # car names and rate of missing horsepower
+    def __init__(self, data):
+        self.car_names = data['Car Name'].cat.categories
+        self.shares = data['Origin'].value_counts(normalize=True).reindex(ORIGINS).fillna(0).to_numpy()
+        self.origins = {}
+        for origin in ORIGINS:
+            rows = data[data['Origin'] == origin]
+            if len(rows) < 2:
+                continue
+            complete = rows[NUMERIC_COLUMNS].dropna()
+            ranks = (complete.rank(method='average').to_numpy() - 0.5) / len(complete)
+            scores = np.interp(ranks, _NORMAL_CDF, _NORMAL_Z)
+            names = rows['Car Name'].value_counts(normalize=True)
+            names = names[names > 0]
+            self.origins[origin] = {
+                'correlation': np.nan_to_num(np.corrcoef(scores, rowvar=False)) + 1e-9 * np.eye(len(NUMERIC_COLUMNS)),
+                'sorted': {column: np.sort(rows[column].dropna().to_numpy(dtype=float)) for column in NUMERIC_COLUMNS},
+                'missing_horsepower': rows['Horsepower'].isna().mean(),
+                'names': self.car_names.get_indexer(names.index),
+                'name_weights': names.to_numpy(),
+            }
+
+    def sample(self, rows, rng):
+        counts = rng.multinomial(rows, self.shares)
+        parts = [self._sample_origin(origin, count, rng)
+                 for origin, count in zip(ORIGINS, counts) if count and origin in self.origins]
+        data = pd.concat(parts, ignore_index=True)
+        # Shuffle so origins are interleaved as in the source file
+        return data.take(rng.permutation(len(data))).reset_index(drop=True)
+
+    def _sample_origin(self, origin, rows, rng):
+        model = self.origins[origin]
+        scores = rng.multivariate_normal(np.zeros(len(NUMERIC_COLUMNS)), model['correlation'], rows,
+                                         method='cholesky')
+        quantiles = np.interp(scores, _NORMAL_Z, _NORMAL_CDF)
+        columns = {}
+        for i, column in enumerate(NUMERIC_COLUMNS):
+            values = model['sorted'][column]
+            position = quantiles[:, i] * (len(values) - 1)
+            if column in DISCRETE_COLUMNS:
+                columns[column] = values[np.rint(position).astype(int)].astype('int64')
+            else:
+                columns[column] = np.round(np.interp(position, np.arange(len(values)), values), 1)
+        columns['Horsepower'][rng.random(rows) < model['missing_horsepower']] = np.nan
+        columns['Origin'] = pd.Categorical.from_codes(np.full(rows, ORIGINS.index(origin)), categories=ORIGINS)
+        codes = rng.choice(model['names'], rows, p=model['name_weights'])
+        columns['Car Name'] = pd.Categorical.from_codes(codes, categories=self.car_names)
+        data = pd.DataFrame(columns)[COLUMNS]
+        data['Manufacturer'] = manufacturers_from_names(data['Car Name'])
+        return data
+
+
+def generate(data, rows, seed=0, chunk_rows=CHUNK_ROWS):
+    # Yields chunks of synthetic rows shaped like data; every chunk shares the same category lists
+    model = AutoMpgModel(data)
+    rng = np.random.default_rng(seed)
+    for start in range(0, rows, chunk_rows):
+        yield model.sample(min(chunk_rows, rows - start), rng)
+
+
+def write_raw(chunks, path):
+    # Same whitespace-separated layout as auto-mpg.data, with '?' for missing horsepower
+    with open(path, 'w') as f:
+        for chunk in chunks:
+            horsepower = chunk['Horsepower'].map('{:.1f}'.format).where(chunk['Horsepower'].notna(), '?')
+            lines = (chunk['MPG'].map('{:.1f}'.format) + ' ' + chunk['Cylinders'].astype(str) + ' '
+                     + chunk['Displacement'].map('{:.1f}'.format) + ' ' + horsepower + ' '
+                     + chunk['Weight'].map('{:.1f}'.format) + ' ' + chunk['Acceleration'].map('{:.1f}'.format) + ' '
+                     + chunk['Model Year'].astype(str) + ' '
+                     + chunk['Origin'].cat.codes.add(1).astype(str) + '\t"' + chunk['Car Name'].astype(str) + '"')
+            f.write('\n'.join(lines) + '\n')
+    return path
+
+
+def write_snapshot_chunks(chunks, path):
+    # Streams chunks into one Arrow IPC snapshot without holding every row in memory
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp_path = path + '.tmp'
+    writer = None
+    with pa.OSFile(tmp_path, 'wb') as sink:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pa.ipc.new_file(sink, table.schema)
+            writer.write_table(table)
+        if writer is not None:
+            writer.close()
+    os.replace(tmp_path, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate Auto MPG shaped data at scale.")
+    parser.add_argument('rows', type=int, help="Number of rows to generate")
+    parser.add_argument('output', help="Output path: .arrow for a snapshot, anything else for the raw text format")
+    parser.add_argument('--source', default=SOURCE, help="URL or local path of auto-mpg.data to fit")
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH, help="Snapshot to fit instead, when it exists")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    chunks = generate(load_auto_mpg(args.snapshot, args.source), args.rows, args.seed)
+    if args.output.endswith('.arrow'):
+        write_snapshot_chunks(chunks, args.output)
+    else:
+        write_raw(chunks, args.output)
+    print(f"Wrote {args.rows} rows to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+import contextlib
+import json
+import os
+import socket
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Every traced rerun is appended here as JSON lines, one span per line, for collecting across servers
+TRACE_PATH = os.environ.get('AUTO_MPG_TRACE')
+# Reruns kept per session for the percentiles and downloads
+TRACE_HISTORY = int(os.environ.get('AUTO_MPG_TRACE_HISTORY', 200))
+
+# Returned by every span of a disabled tracer, so untraced reruns pay one method call per span
+NULL_SPAN = contextlib.nullcontext()
+_write_lock = threading.Lock()
+# tracemalloc is process-wide: it runs while any tracer tracking allocations is open, and is only stopped
+# by the last of them, and only if a tracer started it
+_tracemalloc_lock = threading.Lock()
+_tracemalloc_users = 0
+_tracemalloc_started = False
+
+
+def acquire_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        if _tracemalloc_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc_started = True
+        _tracemalloc_users += 1
+
+
+def release_tracemalloc():
+    global _tracemalloc_users, _tracemalloc_started
+    with _tracemalloc_lock:
+        _tracemalloc_users -= 1
+        if _tracemalloc_users == 0 and _tracemalloc_started:
+            tracemalloc.stop()
+            _tracemalloc_started = False
+
+
+class Span:
+    def __init__(self, tracer, name):
+        self.tracer = tracer
+        self.name = name
+
+    def __enter__(self):
+        tracer = self.tracer
+        # Spans nest under the rerun, which is depth 0
+        self.depth = len(tracer._stack) + 1
+        self.child_peak = 0
+        if tracer.allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            # The parent's peak so far is saved before the peak is reset for this span
+            parent = tracer._stack[-1] if tracer._stack else tracer
+            parent.child_peak = max(parent.child_peak, peak)
+            self.memory = current
+            tracemalloc.reset_peak()
+        tracer._stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        tracer = self.tracer
+        tracer._stack.pop()
+        span = {'name': self.name, 'start': self.start - tracer.origin, 'seconds': end - self.start,
+                'depth': self.depth}
+        if tracer.allocations:
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            # Another session can reset the shared peak or free memory meanwhile; a peak is never negative
+            span['peak_bytes'] = max(peak - self.memory, 0)
+            parent = tracer._stack[-1] if tracer._stack else tracer
+            parent.child_peak = max(parent.child_peak, peak)
+        tracer.spans.append(span)
+        return False
+
+
+class Tracer:
+    # Named timing spans for one rerun, optionally with the peak allocation inside each span
+    def __init__(self, enabled=False, allocations=False):
+        self.enabled = enabled
+        self.allocations = enabled and allocations
+        self.spans = []
+        self.started_at = time.time()
+        self.origin = time.perf_counter()
+        self._stack = []
+        self._finished = False
+        # Sessions tracking allocations at the same time see each other's peaks
+        if self.allocations:
+            acquire_tracemalloc()
+        self.child_peak = 0
+        self.memory = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+
+    def span(self, name):
+        if not self.enabled:
+            return NULL_SPAN
+        return Span(self, name)
+
+    def finish(self):
+        # Closes the rerun with a 'rerun' span covering everything since the tracer was created. Called once
+        # per rerun, including reruns Streamlit interrupts, so tracemalloc is always released.
+        if not self.enabled or self._finished:
+            return None
+        self._finished = True
+        rerun = {'name': 'rerun', 'start': 0.0, 'seconds': time.perf_counter() - self.origin, 'depth': 0}
+        if self.allocations:
+            rerun['peak_bytes'] = max(max(tracemalloc.get_traced_memory()[1], self.child_peak) - self.memory, 0)
+            release_tracemalloc()
+        self.spans.append(rerun)
+        return {'started_at': self.started_at, 'spans': self.spans}
+
+
+class TraceHistory:
+    # The last reruns of one session
+    def __init__(self, session=None, max_reruns=TRACE_HISTORY):
+        self.session = session or format(id(self), 'x')
+        self.max_reruns = max_reruns
+        self.reruns = []
+        self.count = 0
+
+    def add(self, rerun):
+        if rerun is None:
+            return
+        self.count += 1
+        rerun = dict(rerun, rerun=self.count)
+        self.reruns.append(rerun)
+        del self.reruns[:-self.max_reruns]
+        if TRACE_PATH:
+            write_json_lines(TRACE_PATH, self.records([rerun]))
+
+    def summary(self):
+        # Last rerun's spans in order, with p50/p95 of each span name across the kept reruns
+        if not self.reruns:
+            return pd.DataFrame()
+        seconds = {}
+        for rerun in self.reruns:
+            for span in rerun['spans']:
+                seconds.setdefault(span['name'], []).append(span['seconds'])
+        rows = []
+        for span in sorted(self.reruns[-1]['spans'], key=lambda span: span['start']):
+            timings = np.array(seconds[span['name']]) * 1000
+            row = {'span': '  ' * span['depth'] + span['name'], 'last_ms': span['seconds'] * 1000,
+                   'p50_ms': np.percentile(timings, 50), 'p95_ms': np.percentile(timings, 95), 'count': len(timings)}
+            if 'peak_bytes' in span:
+                row['peak_mb'] = span['peak_bytes'] / 1e6
+            rows.append(row)
+        return pd.DataFrame(rows)
+
+    def records(self, reruns=None):
+        # One flat record per span, tagged with where and when it ran so files from many servers can be merged
+        host, pid = socket.gethostname(), os.getpid()
+        for rerun in self.reruns if reruns is None else reruns:
+            for span in rerun['spans']:
+                yield dict(span, host=host, pid=pid, session=self.session, rerun=rerun['rerun'],
+                           timestamp=rerun['started_at'] + span['start'])
+
+    def to_json_lines(self):
+        return ''.join(json.dumps(record) + '\n' for record in self.records())
+
+    def to_chrome_trace(self):
+        # Complete ('X') events for chrome://tracing and Perfetto; each rerun is its own thread row
+        events = [{'name': record['name'], 'ph': 'X', 'ts': record['timestamp'] * 1e6, 'dur': record['seconds'] * 1e6,
+                   'pid': record['pid'], 'tid': record['rerun'],
+                   'args': {key: record[key] for key in ('session', 'peak_bytes') if key in record}}
+                  for record in self.records()]
+        return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
+
+
+def write_json_lines(path, records):
+    lines = ''.join(json.dumps(record) + '\n' for record in records)
+    with _write_lock:
+        with open(path, 'a') as f:
+            f.write(lines)
@@ -0,0 +1,381 @@
+import argparse
+import datetime
+import importlib.metadata
+import importlib.util
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.express as px
+import pyarrow as pa
+
+from auto_mpg_data import SNAPSHOT_PATH, FilterIndex, load_auto_mpg, read_snapshot
+from auto_mpg_figures import ColumnGroups, histogram_figure, scatter_figure, violin_figure
+from auto_mpg_report import correlation_heatmap
+from auto_mpg_stats import CorrelationMoments, TrendlineStats, ols_fits
+from auto_mpg_stream import DataStore, StoreState
+from auto_mpg_synthetic import generate, write_snapshot_chunks
+from auto_mpg_trace import Tracer
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def report(results):
+    for name, result in results.items():
+        if result['seconds'] < 1e-4:
+            line = f"{name:<32}{result['seconds'] * 1e6:10.3f} us"
+        else:
+            line = f"{name:<32}{result['seconds'] * 1000:10.2f} ms"
+        if 'peak_memory_bytes' in result:
+            line += f"{result['peak_memory_bytes'] / 1e6:10.2f} MB peak"
+        if 'peak_rss_bytes' in result:
+            line += f"{result['peak_rss_bytes'] / 1e6:10.2f} MB RSS"
+        if result.get('arrow_bytes', 0) >= 1e4:
+            line += f"{result['arrow_bytes'] / 1e6:10.2f} MB Arrow"
+        if 'payload_bytes' in result:
+            line += f"{result['payload_bytes'] / 1e6:10.2f} MB payload"
+        if 'rows_per_second' in result:
+            line += f"{result['rows_per_second']:12.0f} rows/s"
+        print(line)
+
+
+def peak_rss():
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def reset_peak_rss():
+    # Linux lets a process reset its peak RSS to the current RSS, so each run's peak is its own. Elsewhere the
+    # peak only grows, and its growth during a run is a lower bound.
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+    return peak_rss()
+
+
+def best_of(func, repeat, memory=True):
+    # Best wall time of repeat untraced runs, then one run under tracemalloc for the peak Python and numpy
+    # allocation. tracemalloc misses Arrow buffers and memory-mapped pages, so the last timed run also records
+    # its peak RSS above the RSS it started from, and the Arrow memory its result still holds.
+    # A JSON string result is what st.plotly_chart would send, so its length is the payload.
+    timings = []
+    for _ in range(repeat):
+        # The previous run's result is dropped first, so it is not counted against this one
+        value = None
+        rss = reset_peak_rss()
+        arrow = pa.total_allocated_bytes()
+        start = time.perf_counter()
+        value = func()
+        timings.append(time.perf_counter() - start)
+        peak = peak_rss()
+    result = {'seconds': min(timings), 'arrow_bytes': pa.total_allocated_bytes() - arrow}
+    if rss is not None:
+        result['peak_rss_bytes'] = max(peak - rss, 0)
+    if memory:
+        tracemalloc.start()
+        try:
+            value = func()
+            result['peak_memory_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    if isinstance(value, str):
+        result['payload_bytes'] = len(value)
+    return result
+
+
+def bench_load(snapshot, repeat=3):
+    results = {'snapshot_read': best_of(lambda: read_snapshot(snapshot), repeat)}
+    results['snapshot_read']['file_bytes'] = os.path.getsize(snapshot)
+    report(results)
+    return results
+
+
+def bench_filters(data, repeat=5):
+    index = FilterIndex(data)
+    manufacturer = data['Manufacturer'].value_counts().index[0]
+    first, last = int(data['Model Year'].min()), int(data['Model Year'].max())
+    middle = (first + last) // 2
+
+    # The dashboard's previous behaviour: a full boolean mask (and copy) per filter
+    def masked():
+        filtered = data[data['Manufacturer'] == manufacturer]
+        return filtered[filtered['Model Year'] == middle]
+
+    def indexed():
+        return index.select(data, [manufacturer], (middle, middle))
+
+    def indexed_range():
+        return index.select(data, [manufacturer], (first, middle))
+
+    def masked_years():
+        return data[data['Model Year'].between(first, middle)]
+
+    def indexed_years():
+        return index.select(data, None, (first, middle))
+
+    assert masked().index.equals(indexed().index)
+    assert masked_years().index.equals(indexed_years().index)
+    results = {
+        'build_index': best_of(lambda: FilterIndex(data), 1),
+        'mask_manufacturer_year': best_of(masked, repeat),
+        'index_manufacturer_year': best_of(indexed, repeat),
+        'index_manufacturer_year_range': best_of(indexed_range, repeat),
+        'mask_year_range': best_of(masked_years, repeat),
+        'index_year_range': best_of(indexed_years, repeat),
+        # The slider's default keeps every year
+        'index_all_years': best_of(lambda: index.select(data, None, (first, last)), repeat),
+    }
+    report(results)
+    return results
+
+
+def bench_scatter(data, repeat=1, baseline_rows=2000000):
+    # Build plus JSON serialization, which is what st.plotly_chart sends over the websocket
+    results = {}
+    if len(data) <= baseline_rows:
+        results['scatter_full_rows'] = best_of(lambda: px.scatter(
+            data, x='Weight', y='MPG', color='Origin', hover_data=data.columns).to_json(), repeat)
+    results['scatter_downsampled'] = best_of(lambda: scatter_figure(
+        data, 'Weight', 'MPG', color='Origin', trendline=True, webgl_rows=0).to_json(), repeat)
+    report(results)
+    return results
+
+
+def bench_distributions(data, repeat=1, baseline_rows=2000000):
+    results = {}
+    if len(data) <= baseline_rows:
+        results['histogram_full_rows'] = best_of(lambda: px.histogram(
+            data, x='MPG', color='Origin', nbins=8, barmode='overlay', histnorm='percent').to_json(), repeat)
+        results['violin_full_rows'] = best_of(lambda: px.violin(
+            data, y='MPG', color='Origin', box=True, points="all",
+            hover_data=['Manufacturer', 'Car Name', 'Model Year']).to_json(), repeat)
+
+    results['column_groups'] = best_of(lambda: ColumnGroups(data, 'MPG', 'Origin'), repeat)
+    groups = ColumnGroups(data, 'MPG', 'Origin')
+    # A bin slider move only rebuilds the bars from the cached sorted groups
+    results['histogram_aggregated'] = best_of(lambda: histogram_figure(groups, 8).to_json(), repeat)
+    results['violin_aggregated'] = best_of(lambda: violin_figure(groups, data).to_json(), repeat)
+    report(results)
+    return results
+
+
+def bench_trendline(data, repeat=3, baseline_rows=2000000):
+    index = FilterIndex(data)
+    manufacturer = data['Manufacturer'].value_counts().index[0]
+    results = {}
+    # plotly express fits each color group with statsmodels, which the app itself no longer needs
+    if len(data) <= baseline_rows and importlib.util.find_spec('statsmodels') is not None:
+        results['trendline_statsmodels'] = best_of(lambda: px.scatter(
+            data, x='Weight', y='MPG', color='Origin', trendline='ols'), 1)
+    results['trendline_grouped_moments'] = best_of(lambda: ols_fits(data, 'Weight', 'MPG', 'Origin'), repeat)
+    results['trendline_stats_build'] = best_of(lambda: TrendlineStats(data, 'Weight', 'MPG', index), 1)
+    stats = TrendlineStats(data, 'Weight', 'MPG', index)
+    results['trendline_stats_filtered_fit'] = best_of(lambda: stats.fits(True, [manufacturer], (72, 76)), repeat)
+    report(results)
+    return results
+
+
+def bench_heatmap(data, repeat=3):
+    columns = data.select_dtypes(include=['float64', 'int32']).columns
+    results = {'corr_full_rows': best_of(lambda: data[columns].corr(), repeat)}
+    results['corr_moments_build'] = best_of(lambda: CorrelationMoments(data, columns), repeat)
+    state = StoreState('', data, None, CorrelationMoments(data, columns), {})
+    results['heatmap_from_moments'] = best_of(lambda: correlation_heatmap(state).to_json(), repeat)
+    report(results)
+    return results
+
+
+def bench_stream(data, batch_rows=10000):
+    # Appending one batch to a store that already serves the histogram, violin and heatmap aggregates
+    batch_rows = min(batch_rows, len(data) // 10)
+    base = data.iloc[:len(data) - batch_rows].reset_index(drop=True)
+    batch = data.iloc[len(data) - batch_rows:].reset_index(drop=True)
+    results = {'stream_store_build': best_of(lambda: DataStore(base), 1)}
+    store = DataStore(base)
+    for column in ['MPG', 'Weight']:
+        store.state.column_groups(column, 'Origin')
+    # Each call appends to the latest state, so the traced run measures a second batch of the same size
+    results['stream_append_batch'] = best_of(lambda: store.append(batch), 1)
+    results['stream_append_batch']['rows_per_second'] = batch_rows / results['stream_append_batch']['seconds']
+
+    # The first session to draw the new version joins the queued batches into the rows, index and groups
+    def join():
+        state = store.state
+        for column in ['MPG', 'Weight']:
+            state.column_groups(column, 'Origin')
+    results['stream_join_version'] = best_of(join, 1, memory=False)
+    report(results)
+    return results
+
+
+def bench_tracing(spans=200000):
+    # Cost of one span over an uninstrumented loop; tests/test_trace.py holds the disabled cost to a budget
+    def loop(tracer):
+        start = time.perf_counter()
+        for _ in range(spans):
+            with tracer.span('bench'):
+                pass
+        return time.perf_counter() - start
+
+    def bare_loop():
+        start = time.perf_counter()
+        for _ in range(spans):
+            pass
+        return time.perf_counter() - start
+
+    bare = min(bare_loop() for _ in range(3))
+    results = {}
+    for name, enabled, allocations in [('span_disabled', False, False), ('span_enabled', True, False),
+                                       ('span_enabled_allocations', True, True)]:
+        tracer = Tracer(enabled, allocations)
+        seconds = min(loop(tracer) for _ in range(3))
+        tracer.finish()
+        results[name] = {'seconds': max(seconds - bare, 0.0) / spans}
+    report(results)
+    return results
+
+
+APP = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'AUTO_MPG_REPORT_AND_DASHBOARD.py')
+# Modules the app must not import on a cold start
+HEAVY_MODULES = ['seaborn', 'matplotlib', 'altair', 'statsmodels']
+
+FIRST_RENDER = """
+import json, sys, time
+start = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=600)
+if sys.argv[2] != 'Dashboard':
+    app.session_state['view'] = sys.argv[2]
+app.run()
+print(json.dumps({'seconds': time.perf_counter() - start, 'exceptions': [str(e.value) for e in app.exception],
+                  'heavy_modules': [m for m in sys.argv[3:] if m in sys.modules]}))
+"""
+
+
+def bench_startup(snapshot, repeat=3):
+    # Every measurement runs in a fresh interpreter, so nothing is already imported or cached
+    env = dict(os.environ, AUTO_MPG_SNAPSHOT=snapshot)
+    results = {}
+    imports = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'import streamlit, auto_mpg_report, auto_mpg_stream'],
+                       check=True, env=env, cwd=os.path.dirname(APP))
+        imports.append(time.perf_counter() - start)
+    results['import_app_modules'] = {'seconds': min(imports)}
+    for view in ['Dashboard', 'Report']:
+        runs = []
+        for _ in range(repeat):
+            output = subprocess.run([sys.executable, '-c', FIRST_RENDER, APP, view] + HEAVY_MODULES, check=True,
+                                    env=env, capture_output=True, text=True).stdout
+            runs.append(json.loads(output.strip().splitlines()[-1]))
+        if runs[-1]['exceptions'] or runs[-1]['heavy_modules']:
+            raise RuntimeError(f"{view} first render: {runs[-1]}")
+        results[f'first_render_{view.lower()}'] = {'seconds': min(run['seconds'] for run in runs)}
+    report(results)
+    return results
+
+
+def environment(data, snapshot, synthetic_rows, seed):
+    # Enough context to tell whether two reports are comparable
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(APP)).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'rows': len(data), 'snapshot': snapshot, 'synthetic_rows': synthetic_rows, 'seed': seed, 'commit': commit,
+            'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'numpy': np.__version__, 'pandas': pd.__version__, 'plotly': plotly.__version__,
+            'pyarrow': pa.__version__, 'streamlit': package_version('streamlit')}
+
+
+def package_version(name):
+    # Read from the installed metadata, so the benchmark does not import the package
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def compare(baseline, current):
+    # Time ratio of every measurement present in both reports; above 1 means slower than the baseline
+    print(f"{'':<44}{'baseline':>12}{'current':>12}{'ratio':>8}")
+    for stage, results in current['stages'].items():
+        for name, result in results.items():
+            before = baseline.get('stages', {}).get(stage, {}).get(name)
+            if before and before['seconds']:
+                print(f"{stage + '.' + name:<44}{before['seconds'] * 1000:10.2f}ms{result['seconds'] * 1000:10.2f}ms"
+                      f"{result['seconds'] / before['seconds']:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the dashboard's data pipeline.")
+    parser.add_argument('--snapshot', default=SNAPSHOT_PATH, help="Arrow snapshot to load")
+    parser.add_argument('--rows', type=int, default=None,
+                        help="Generate this many synthetic rows shaped like the snapshot and benchmark those")
+    parser.add_argument('--seed', type=int, default=0, help="Seed for the synthetic rows")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', default=None, help="Write the results as JSON to this path")
+    parser.add_argument('--compare', default=None, help="A previous JSON report to print time ratios against")
+    parser.add_argument('--startup', action='store_true', help="Only time imports and the first render of each tab")
+    parser.add_argument('--max-first-render', type=float, default=None,
+                        help="Exit with an error when a tab's first render takes longer than this many seconds")
+    args = parser.parse_args()
+
+    snapshot = args.snapshot
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.rows:
+            # Written to disk so the load stage times the same memory-mapped read the app does
+            snapshot = write_snapshot_chunks(generate(load_auto_mpg(args.snapshot), args.rows, args.seed),
+                                             os.path.join(tmp, 'auto_mpg.arrow'))
+
+        stages = {}
+        if args.startup:
+            stages['startup'] = bench_startup(snapshot)
+            data = load_auto_mpg(snapshot)
+        else:
+            stages['load'] = bench_load(snapshot)
+            data = load_auto_mpg(snapshot)
+            print(f"{len(data)} rows")
+            stages['filters'] = bench_filters(data, args.repeat)
+            stages['scatter'] = bench_scatter(data)
+            stages['distributions'] = bench_distributions(data)
+            stages['trendline'] = bench_trendline(data)
+            stages['heatmap'] = bench_heatmap(data)
+            stages['stream'] = bench_stream(data)
+            stages['tracing'] = bench_tracing()
+
+    results = {'environment': environment(data, args.snapshot, args.rows, args.seed), 'stages': stages}
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), results)
+
+    if args.startup:
+        slow = [name for name, result in stages['startup'].items()
+                if name.startswith('first_render') and args.max_first_render and result['seconds'] > args.max_first_render]
+        if slow:
+            sys.exit(f"Over the {args.max_first_render}s first-render budget: {', '.join(slow)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+from html.parser import HTMLParser
+
+import pytest
+
+import auto_mpg_export
+from auto_mpg_report import SECTIONS
+
+
+class ListChecker(HTMLParser):
+    # Records the parent of every <li> and whether every opened tag was closed in order
+    def __init__(self):
+        super().__init__()
+        self.stack = []
+        self.item_parents = []
+        self.balanced = True
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'li':
+            self.item_parents.append(self.stack[-1] if self.stack else None)
+        self.stack.append(tag)
+
+    def handle_endtag(self, tag):
+        if not self.stack or self.stack.pop() != tag:
+            self.balanced = False
+
+
+def check(markup):
+    checker = ListChecker()
+    checker.feed(markup)
+    assert checker.balanced and not checker.stack
+    return checker
+
+
+@pytest.fixture
+def fallback(monkeypatch):
+    monkeypatch.setattr(auto_mpg_export, 'markdown', None)
+    return auto_mpg_export.markdown_to_html
+
+
+def test_fallback_wraps_list_runs(fallback):
+    markup = fallback("""
+        ## 4.0 Key Correlations
+        - **MPG and Weight:**
+        - Strong negative correlation
+        Plain text between lists.
+
+        1. **Engine Efficiency Trends**: larger engines
+        2. **Temporal Improvements**: newer cars
+        - a bullet straight after a numbered item
+        """)
+    assert markup.splitlines() == [
+        '<h2>4.0 Key Correlations</h2>',
+        '<ul>', '<li><strong>MPG and Weight:</strong></li>', '<li>Strong negative correlation</li>', '</ul>',
+        '<p>Plain text between lists.</p>',
+        '<ol>', '<li><strong>Engine Efficiency Trends</strong>: larger engines</li>',
+        '<li><strong>Temporal Improvements</strong>: newer cars</li>', '</ol>',
+        '<ul>', '<li>a bullet straight after a numbered item</li>', '</ul>',
+    ]
+
+
+def test_fallback_report_is_valid(fallback):
+    for kind, content in SECTIONS:
+        if kind == 'markdown':
+            checker = check(fallback(content))
+            assert all(parent in ('ul', 'ol') for parent in checker.item_parents)
+
+
+def test_fallback_escapes_html(fallback):
+    assert fallback("a <b> & c") == '<p>a &lt;b&gt; &amp; c</p>'
@@ -0,0 +1,66 @@
+import pandas as pd
+import plotly.graph_objects as go
+
+from auto_mpg_cache import FigureCache, dataset_version
+
+
+def make_data():
+    return pd.DataFrame({'MPG': [18.0, 15.0, 36.0], 'Weight': [3504.0, 3693.0, 1985.0],
+                         'Origin': pd.Categorical(['USA', 'USA', 'Japan'], categories=['USA', 'Europe', 'Japan'])})
+
+
+def figure(size=10):
+    return go.Figure(go.Scatter(x=list(range(size)), y=list(range(size))))
+
+
+def test_editing_a_value_changes_the_version_and_misses():
+    cache = FigureCache()
+    data = make_data()
+    builds = []
+    cache.get((dataset_version(data), 'scatter'), lambda: builds.append(1) or figure())
+
+    data.loc[1, 'MPG'] = 16.0
+    cache.get((dataset_version(data), 'scatter'), lambda: builds.append(1) or figure())
+    assert len(builds) == 2
+    assert cache.misses == 2
+    assert cache.hits == 0
+
+
+def test_reordering_rows_changes_the_version():
+    data = make_data()
+    assert dataset_version(data.iloc[[1, 0, 2]].reset_index(drop=True)) != dataset_version(data)
+
+
+def test_unchanged_reload_hits():
+    cache = FigureCache()
+    first = cache.get((dataset_version(make_data()), 'scatter'), figure)
+    again = cache.get((dataset_version(make_data()), 'scatter'), unexpected_build)
+    assert again is first
+    assert cache.hits == 1
+
+
+def unexpected_build():
+    raise AssertionError("an unchanged dataset rebuilt its figure")
+
+
+def test_lru_evicts_the_oldest_entry_over_budget():
+    size = len(figure().to_json())
+    cache = FigureCache(max_bytes=2 * size)
+    cache.get('a', figure)
+    cache.get('b', figure)
+    cache.get('a', figure)
+    cache.get('c', figure)
+    assert 'b' not in cache
+    assert 'a' in cache and 'c' in cache
+    assert cache.bytes <= cache.max_bytes
+
+
+def test_counters():
+    size = len(figure().to_json())
+    cache = FigureCache(max_bytes=2 * size)
+    for key in ['a', 'b', 'a', 'c', 'd', 'c']:
+        cache.get(key, figure)
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 4, 2)
+    assert stats['entries'] == 2
+    assert stats['hit_rate'] == 2 / 6
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auto_mpg_data import ORIGINS
+from auto_mpg_stream import DataStore, StreamTail
+
+
+def make_rows(rows, seed, manufacturers=('amc', 'ford', 'vw')):
+    rng = np.random.default_rng(seed)
+    mpg = rng.normal(24, 6, rows)
+    mpg[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        'MPG': mpg, 'Weight': rng.normal(3000, 800, rows), 'Model Year': rng.integers(70, 83, rows),
+        'Origin': pd.Categorical.from_codes(rng.integers(0, 3, rows), categories=ORIGINS),
+        'Manufacturer': pd.Categorical(rng.choice(manufacturers, rows)),
+    })
+
+
+def assert_same_state(state, frames):
+    data = pd.concat(frames, ignore_index=True)
+    data['Manufacturer'] = data['Manufacturer'].astype(state.data['Manufacturer'].dtype)
+    expected = DataStore(data).state
+    pd.testing.assert_frame_equal(state.data, expected.data)
+    for manufacturers, years in [(['ford'], None), (None, (72, 76)), (['amc', 'saab'], (70, 80))]:
+        np.testing.assert_array_equal(state.index.lookup(manufacturers, years),
+                                      expected.index.lookup(manufacturers, years))
+    for color in [None, 'Origin']:
+        groups, fresh = state.column_groups('MPG', color), expected.column_groups('MPG', color)
+        np.testing.assert_array_equal(groups.values, fresh.values)
+        np.testing.assert_array_equal(groups.bounds, fresh.bounds)
+        # Ties may be ordered differently, but each value keeps its own row
+        np.testing.assert_array_equal(state.data['MPG'].to_numpy()[groups.positions], groups.values)
+    pd.testing.assert_frame_equal(state.correlation.corr(), expected.correlation.corr(), rtol=1e-9)
+
+
+@pytest.mark.parametrize('read_between', [False, True])
+def test_appends_match_a_store_built_from_all_rows(read_between):
+    base = make_rows(500, 0)
+    store = DataStore(base)
+    store.state.column_groups('MPG', 'Origin')
+    frames = [base]
+    for seed in range(1, 5):
+        batch = make_rows(50, seed, ('ford', 'saab'))
+        store.append(batch)
+        frames.append(batch)
+        if read_between:
+            store.state.column_groups('MPG')
+    assert store.state.rows == 700
+    assert_same_state(store.state, frames)
+
+
+def test_append_does_not_join_rows():
+    store = DataStore(make_rows(500, 0))
+    store.append(make_rows(50, 1))
+    store.append(make_rows(50, 2))
+    state = store.state
+    assert state.base is not None and len(state.batches) == 2
+    assert store.metrics()['rows'] == 600
+    assert len(state.data) == 600
+    assert state.base is None
+
+
+def test_malformed_batch_file_keeps_the_others(tmp_path):
+    line = '18.0 8 307.0 130.0 3504.0 12.0 70 1\t"chevrolet chevelle malibu"\n'
+    (tmp_path / 'a.data').write_text(line)
+    (tmp_path / 'b.data').write_text('not a row\n')
+    (tmp_path / 'c.data').write_text(line.replace('chevrolet', 'ford'))
+    tail = StreamTail(str(tmp_path))
+    batch = tail.read()
+    assert list(batch['Manufacturer'].astype(str)) == ['chevrolet', 'ford']
+    assert tail.seen == {'a.data', 'c.data'}
+    assert list(tail.errors) == ['b.data']
+    # The malformed file is retried until it parses
+    assert tail.read() is None
+    (tmp_path / 'b.data').write_text(line.replace('chevrolet', 'amc'))
+    assert list(tail.read()['Manufacturer'].astype(str)) == ['amc']
+    assert tail.errors == {}
@@ -0,0 +1,80 @@
+import time
+import tracemalloc
+
+import pytest
+
+from auto_mpg_trace import NULL_SPAN, TraceHistory, Tracer
+
+# Most spans one rerun can open: the dashboard with every figure rebuilt, or the report
+SPANS_PER_RERUN = 16
+
+
+def test_interrupted_rerun_releases_tracemalloc():
+    assert not tracemalloc.is_tracing()
+    tracer = Tracer(enabled=True, allocations=True)
+    # Streamlit stops a rerun by raising from inside the script
+    with pytest.raises(RuntimeError):
+        try:
+            with tracer.span('scatter.figure'):
+                raise RuntimeError("rerun requested")
+        finally:
+            rerun = tracer.finish()
+    assert not tracemalloc.is_tracing()
+    assert [span['name'] for span in rerun['spans']] == ['scatter.figure', 'rerun']
+    assert tracer.finish() is None
+
+
+def test_tracemalloc_runs_until_the_last_tracer_finishes():
+    first = Tracer(enabled=True, allocations=True)
+    second = Tracer(enabled=True, allocations=True)
+    first.finish()
+    assert tracemalloc.is_tracing()
+    with second.span('report.correlation_heatmap'):
+        block = bytearray(1000000)
+    rerun = second.finish()
+    del block
+    assert not tracemalloc.is_tracing()
+    assert all(span['peak_bytes'] >= 0 for span in rerun['spans'])
+    assert rerun['spans'][0]['peak_bytes'] >= 1000000
+
+
+def test_tracemalloc_started_elsewhere_is_left_running():
+    tracemalloc.start()
+    try:
+        Tracer(enabled=True, allocations=True).finish()
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+
+
+
+@pytest.mark.parametrize('max_reruns', [1, 3])
+def test_history_keeps_the_last_reruns(max_reruns):
+    history = TraceHistory(max_reruns=max_reruns)
+    for _ in range(5):
+        history.add(Tracer(enabled=True).finish())
+    assert [rerun['rerun'] for rerun in history.reruns] == list(range(6 - max_reruns, 6))
+
+
+def test_disabled_tracing_overhead_is_negligible():
+    # Disabled spans run on every rerun of every session; a rerun's worth must cost well under 0.1 ms
+    tracer = Tracer()
+    assert tracer.span('filter') is NULL_SPAN
+    spans = 100000
+
+    def traced():
+        start = time.perf_counter()
+        for _ in range(spans):
+            with tracer.span('filter'):
+                pass
+        return time.perf_counter() - start
+
+    def bare():
+        start = time.perf_counter()
+        for _ in range(spans):
+            pass
+        return time.perf_counter() - start
+
+    per_span = (min(traced() for _ in range(5)) - min(bare() for _ in range(5))) / spans
+    assert per_span * SPANS_PER_RERUN < 0.0001
+    assert tracer.finish() is None
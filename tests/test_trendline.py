@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from auto_mpg_data import ORIGINS, FilterIndex
+from auto_mpg_stats import TrendlineStats, ols_fits
+
+sm = pytest.importorskip("statsmodels.api")
+
+
+@pytest.fixture(scope='module')
+def data():
+    rng = np.random.default_rng(0)
+    rows = 2000
+    weight = rng.normal(3000, 800, rows)
+    mpg = 46 - 0.0075 * weight + rng.normal(0, 3, rows)
+    mpg[rng.random(rows) < 0.02] = np.nan
+    return pd.DataFrame({
+        'MPG': mpg, 'Weight': weight, 'Model Year': rng.integers(70, 83, rows),
+        'Origin': pd.Categorical.from_codes(rng.integers(0, 3, rows), categories=ORIGINS),
+        'Manufacturer': pd.Categorical.from_codes(rng.integers(0, 4, rows), categories=['amc', 'ford', 'honda', 'vw']),
+    })
+
+
+def statsmodels_fit(rows):
+    rows = rows.dropna(subset=['Weight', 'MPG'])
+    result = sm.OLS(rows['MPG'], sm.add_constant(rows['Weight'])).fit()
+    return result.params['Weight'], result.params['const'], result.rsquared
+
+
+def assert_matches(fit, rows):
+    slope, intercept, rsquared = statsmodels_fit(rows)
+    np.testing.assert_allclose([fit['slope'], fit['intercept'], fit['rsquared']], [slope, intercept, rsquared],
+                               rtol=1e-9)
+
+
+def test_per_origin_matches_statsmodels(data):
+    stats = TrendlineStats(data, 'Weight', 'MPG', FilterIndex(data))
+    for fits in [stats.fits(by_origin=True), ols_fits(data, 'Weight', 'MPG', 'Origin')]:
+        assert list(fits.index) == ORIGINS
+        for origin in ORIGINS:
+            assert_matches(fits.loc[origin], data[data['Origin'] == origin])
+
+
+def test_pooled_matches_statsmodels(data):
+    stats = TrendlineStats(data, 'Weight', 'MPG', FilterIndex(data))
+    assert_matches(stats.fits(by_origin=False).iloc[0], data)
+    assert_matches(ols_fits(data, 'Weight', 'MPG').iloc[0], data)
+
+
+def test_filtered_matches_statsmodels(data):
+    stats = TrendlineStats(data, 'Weight', 'MPG', FilterIndex(data))
+    fits = stats.fits(by_origin=True, manufacturers=['ford', 'vw'], years=(72, 76))
+    rows = data[data['Manufacturer'].isin(['ford', 'vw']) & data['Model Year'].between(72, 76)]
+    for origin in ORIGINS:
+        assert_matches(fits.loc[origin], rows[rows['Origin'] == origin])